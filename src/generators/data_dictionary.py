@@ -1,10 +1,15 @@
-import json
+import csv
+import itertools
+import tempfile
+import orjson
 import psycopg2
-from psycopg2.extras import RealDictCursor
-import pandas as pd
+from psycopg2.pool import ThreadedConnectionPool
+import xlsxwriter
 from pathlib import Path
 import sys
 import logging
+from dataclasses import dataclass, fields
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Configure logging
 logging.basicConfig(
@@ -17,30 +22,392 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def test_connection(db_config):
-    """Test database connection and return (success, error_message)."""
+# Maximum number of databases processed concurrently
+MAX_DATABASE_WORKERS = 4
+
+# Maximum number of catalog queries run concurrently per database, which is
+# also the size of each database's connection pool. Databases often share one
+# server, so the run opens at most MAX_DATABASE_WORKERS * MAX_SCHEMA_WORKERS
+# (16) connections, well under PostgreSQL's default max_connections.
+MAX_SCHEMA_WORKERS = 4
+
+# Maximum number of schemas fetched ahead of the workbook writer. Each fetched
+# schema holds one open spool file per catalog query until it is written, so
+# this bounds the open file descriptors per database.
+SCHEMA_WINDOW = 2 * MAX_SCHEMA_WORKERS
+
+# Per-database outcomes reported in the run summary
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+# Largest CSV field read back from a spooled query. Definitions and comments
+# can exceed the csv module's 128 KiB default; this is the largest limit a C
+# long holds on every platform, Windows included.
+CSV_FIELD_SIZE_LIMIT = 2**31 - 1
+csv.field_size_limit(CSV_FIELD_SIZE_LIMIT)
+
+# Every user schema with its physical tables, one row per table
+CATALOG_SNAPSHOT_SQL = """
+    SELECT 
+        n.nspname as schema_name,
+        obj_description(n.oid, 'pg_namespace') as schema_description,
+        c.relname as tablename,
+        pg_get_userbyid(c.relowner) as tableowner,
+        obj_description(c.oid, 'pg_class') as table_description
+    FROM pg_namespace n
+    LEFT JOIN pg_class c ON c.relnamespace = n.oid AND c.relkind IN ('r', 'p')
+    WHERE n.nspname NOT IN ('pg_catalog', 'information_schema', 'pg_toast')
+    ORDER BY n.nspname, c.relname
+"""
+
+# Columns of every table in a schema; parameters are the schema name twice
+COLUMNS_SQL = """
+    WITH pk_info AS (
+        SELECT i.indrelid, a.attname
+        FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+        WHERE i.indisprimary
+    ),
+    fk_info AS (
+        SELECT
+            con.conrelid,
+            k.attnum,
+            fn.nspname AS foreign_schema,
+            fc.relname AS foreign_table,
+            fa.attname AS foreign_column
+        FROM pg_catalog.pg_constraint con
+        CROSS JOIN LATERAL unnest(con.conkey, con.confkey) AS k(attnum, fattnum)
+        JOIN pg_catalog.pg_class fc ON fc.oid = con.confrelid
+        JOIN pg_catalog.pg_namespace fn ON fn.oid = fc.relnamespace
+        JOIN pg_catalog.pg_attribute fa ON fa.attrelid = con.confrelid AND fa.attnum = k.fattnum
+        WHERE con.contype = 'f'
+        AND con.connamespace = (SELECT oid FROM pg_catalog.pg_namespace WHERE nspname = %s)
+    )
+    SELECT 
+        n.nspname as schema_name,
+        c.relname as table_name,
+        a.attname as column_name,
+        pg_catalog.format_type(a.atttypid, a.atttypmod) as data_type,
+        col_description(a.attrelid, a.attnum) as column_description,
+        a.attnotnull as is_not_null,
+        CASE WHEN a.atthasdef THEN pg_get_expr(ad.adbin, ad.adrelid) END as default_value,
+        CASE WHEN pk.attname IS NOT NULL THEN true ELSE false END as is_primary_key,
+        fk.foreign_schema,
+        fk.foreign_table,
+        fk.foreign_column
+    FROM pg_catalog.pg_attribute a
+    JOIN pg_catalog.pg_class c ON a.attrelid = c.oid
+    JOIN pg_catalog.pg_namespace n ON c.relnamespace = n.oid
+    LEFT JOIN pg_catalog.pg_attrdef ad ON ad.adrelid = a.attrelid AND ad.adnum = a.attnum
+    LEFT JOIN pk_info pk ON pk.indrelid = c.oid AND pk.attname = a.attname
+    LEFT JOIN fk_info fk ON fk.conrelid = c.oid AND fk.attnum = a.attnum
+    WHERE c.relkind IN ('r', 'p')
+    AND n.nspname = %s
+    AND a.attnum > 0
+    AND NOT a.attisdropped
+    ORDER BY c.relname, a.attnum
+"""
+
+# Constraints of every table in a schema
+CONSTRAINTS_SQL = """
+    SELECT
+        nsp.nspname as schema_name,
+        rel.relname as table_name,
+        con.conname as constraint_name,
+        CASE con.contype
+            WHEN 'p' THEN 'PRIMARY KEY'
+            WHEN 'f' THEN 'FOREIGN KEY'
+            WHEN 'u' THEN 'UNIQUE'
+            WHEN 'c' THEN 'CHECK'
+            ELSE con.contype::text
+        END as constraint_type,
+        pg_get_constraintdef(con.oid) as constraint_definition
+    FROM pg_catalog.pg_constraint con
+    JOIN pg_catalog.pg_class rel ON rel.oid = con.conrelid
+    JOIN pg_catalog.pg_namespace nsp ON nsp.oid = rel.relnamespace
+    WHERE rel.relkind IN ('r', 'p')
+    AND nsp.nspname = %s
+    ORDER BY rel.relname, con.conname
+"""
+
+# Indexes of every table in a schema
+INDEXES_SQL = """
+    SELECT
+        n.nspname as schema_name,
+        c.relname as table_name,
+        i.relname as index_name,
+        am.amname as index_type,
+        pg_get_indexdef(i.oid) as index_definition
+    FROM pg_index x
+    JOIN pg_class c ON c.oid = x.indrelid
+    JOIN pg_class i ON i.oid = x.indexrelid
+    JOIN pg_am am ON i.relam = am.oid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.relkind IN ('r', 'p')
+    AND n.nspname = %s
+    ORDER BY c.relname, i.relname
+"""
+
+@dataclass(frozen=True)
+class DBConfig:
+    """Connection settings of one database from the connection file."""
+    name: str
+    database: str
+    username: str
+    password: str
+    endpoint_rw: str
+    port: int
+    
+    @classmethod
+    def from_dict(cls, config):
+        """Build a DBConfig from a connection file entry, ignoring unknown keys."""
+        return cls(**{field.name: config[field.name] for field in fields(cls)})
+
+    def to_dsn(self):
+        """Return the psycopg2 connection keyword arguments."""
+        return {
+            'dbname': self.database,
+            'user': self.username,
+            'password': self.password,
+            'host': self.endpoint_rw,
+            'port': self.port
+        }
+
+def classify_connection_error(error, db_config):
+    """Return a readable message for a failure to connect to a database."""
+    error_msg = str(error)
+    if "password authentication failed" in error_msg.lower():
+        return f"Authentication failed for database {db_config.name}. Please check username and password."
+    elif "could not connect to server" in error_msg.lower():
+        return f"Could not connect to database {db_config.name} at {db_config.endpoint_rw}:{db_config.port}. Please check host and port."
+    elif "database" in error_msg.lower() and "does not exist" in error_msg.lower():
+        return f"Database {db_config.database} does not exist at {db_config.endpoint_rw}."
+    else:
+        return f"Error connecting to database {db_config.name}: {error_msg}"
+
+def fetch_catalog_snapshot(conn):
+    """Fetch every user schema together with its tables in a single query.
+    
+    Returns (schemas, tables_by_schema) where schemas is a list of dicts with
+    schema_name and schema_description, and tables_by_schema maps each schema
+    name to its table rows in TABLE_HEADERS order.
+    """
+    schemas = []
+    tables_by_schema = {}
+    with conn.cursor() as cursor:
+        cursor.execute(CATALOG_SNAPSHOT_SQL)
+        for schema_name, schema_description, tablename, tableowner, table_description in cursor:
+            if schema_name not in tables_by_schema:
+                schemas.append({
+                    'schema_name': schema_name,
+                    'schema_description': schema_description
+                })
+                tables_by_schema[schema_name] = []
+            # Schemas without tables come back as a single row of NULLs
+            if tablename is not None:
+                tables_by_schema[schema_name].append(
+                    (schema_name, tablename, tableowner, table_description, schema_description)
+                )
+    return schemas, tables_by_schema
+
+def read_spooled_csv(csv_file, flag_columns=()):
+    """Yield the rows of a spooled COPY dump, closing the file when done.
+    
+    flag_columns are the indexes of boolean columns, which CSV carries as t/f.
+    """
+    try:
+        for row in csv.reader(csv_file):
+            # CSV carries NULLs as empty fields
+            row = [value if value != '' else None for value in row]
+            for i in flag_columns:
+                row[i] = row[i] == 't'
+            yield row
+    finally:
+        csv_file.close()
+
+def spool_query(conn, sql, params):
+    """Run a catalog query through COPY into a temporary CSV file.
+    
+    The rows go straight from the server to disk and are read back lazily
+    while the workbook is written, so a schema's result is never held in
+    memory. Returns (headers, csv_file) with the file positioned after the
+    header row.
+    """
+    csv_file = tempfile.TemporaryFile('w+', newline='', encoding='utf-8')
+    try:
+        with conn.cursor() as cursor:
+            query = cursor.mogrify(sql, params).decode()
+            cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH CSV HEADER", csv_file)
+        csv_file.seek(0)
+        headers = next(csv.reader(csv_file))
+    except Exception:
+        csv_file.close()
+        raise
+    return headers, csv_file
+
+def fetch_columns(conn, schema):
+    """Fetch the columns of every table in a schema."""
+    schema_name = schema['schema_name']
+    headers, csv_file = spool_query(conn, COLUMNS_SQL, (schema_name, schema_name))
+    flags = [headers.index('is_not_null'), headers.index('is_primary_key')]
+    return headers, read_spooled_csv(csv_file, flags)
+
+def fetch_constraints(conn, schema):
+    """Fetch the constraints of every table in a schema."""
+    headers, csv_file = spool_query(conn, CONSTRAINTS_SQL, (schema['schema_name'],))
+    return headers, read_spooled_csv(csv_file)
+
+def fetch_indexes(conn, schema):
+    """Fetch the indexes of every table in a schema."""
+    headers, csv_file = spool_query(conn, INDEXES_SQL, (schema['schema_name'],))
+    return headers, read_spooled_csv(csv_file)
+
+# Catalog queries run for each schema with tables, in workbook sheet order
+CATALOG_FETCHERS = (fetch_columns, fetch_constraints, fetch_indexes)
+
+# Workbook sheets, in the order of the tables rows followed by CATALOG_FETCHERS
+SHEET_NAMES = ('Tables', 'Columns', 'Constraints', 'Indexes')
+
+# Header of the Tables sheet, matching the rows from fetch_catalog_snapshot
+TABLE_HEADERS = ('schemaname', 'tablename', 'tableowner', 'table_description', 'schema_description')
+
+def write_rows(worksheet, headers, rows, row):
+    """Append rows to a worksheet starting at the given row.
+    
+    The header is written first when the sheet is still empty. Returns the
+    next free row.
+    """
+    if row == 0:
+        worksheet.write_row(0, 0, headers)
+        row = 1
+    # None values become blank cells
+    for values in rows:
+        worksheet.write_row(row, 0, values)
+        row += 1
+    return row
+
+def run_with_pooled_connection(pool, fetch, schema):
+    """Run a catalog fetch for one schema on its own connection from the pool."""
+    conn = pool.getconn()
     try:
-        conn = psycopg2.connect(
-            dbname=db_config['database'],
-            user=db_config['username'],
-            password=db_config['password'],
-            host=db_config['endpoint_rw'],
-            port=db_config['port']
-        )
-        conn.close()
-        return True, None
-    except psycopg2.OperationalError as e:
-        error_msg = str(e)
-        if "password authentication failed" in error_msg.lower():
-            return False, f"Authentication failed for database {db_config['name']}. Please check username and password."
-        elif "could not connect to server" in error_msg.lower():
-            return False, f"Could not connect to database {db_config['name']} at {db_config['endpoint_rw']}:{db_config['port']}. Please check host and port."
-        elif "database" in error_msg.lower() and "does not exist" in error_msg.lower():
-            return False, f"Database {db_config['database']} does not exist at {db_config['endpoint_rw']}."
-        else:
-            return False, f"Error connecting to database {db_config['name']}: {error_msg}"
+        return fetch(conn, schema)
+    finally:
+        pool.putconn(conn)
+
+def submit_catalog_fetches(executor, pool, schema):
+    """Submit every catalog query of one schema, in CATALOG_FETCHERS order."""
+    return [
+        executor.submit(run_with_pooled_connection, pool, fetch, schema)
+        for fetch in CATALOG_FETCHERS
+    ]
+
+def _process_db(db_config, output_path):
+    """Generate the data dictionary for one database.
+    
+    Returns SUCCEEDED, FAILED or SKIPPED for the run summary.
+    """
+    try:
+        logger.info(f"\nProcessing database: {db_config.name}")
+        
+        # Pool of connections so catalog queries can run in parallel. Its
+        # first connection is opened here and serves the catalog snapshot, so
+        # connection problems surface here without a separate test.
+        try:
+            pool = ThreadedConnectionPool(1, MAX_SCHEMA_WORKERS, **db_config.to_dsn())
+        except psycopg2.OperationalError as e:
+            logger.error(classify_connection_error(e, db_config))
+            return FAILED
+        # psycopg2 closes returned connections once minconn are idle; keep
+        # every connection the workers open so later queries reuse it
+        pool.minconn = MAX_SCHEMA_WORKERS
+        
+        try:
+            # Create directory for this database
+            db_path = output_path / db_config.name
+            db_path.mkdir(exist_ok=True)
+            
+            # Get schemas and their tables in one pass over the catalog
+            conn = pool.getconn()
+            try:
+                schemas, tables_by_schema = fetch_catalog_snapshot(conn)
+            finally:
+                pool.putconn(conn)
+            
+            if not schemas:
+                logger.warning(f"No user schemas found in database {db_config.name}")
+                return SKIPPED
+            
+            # Run the catalog queries of upcoming schemas concurrently, each
+            # on its own pooled connection, so a schema costs about one round
+            # trip instead of one per query. Workers never exceed the pool
+            # size. Only SCHEMA_WINDOW schemas are fetched ahead of the
+            # writer; the next one is submitted as each is written. Schemas
+            # without tables need no further queries.
+            excel_path = db_path / f"{db_config.name}_data_dictionary.xlsx"
+            written_schemas = 0
+            failed_schemas = 0
+            with ThreadPoolExecutor(max_workers=MAX_SCHEMA_WORKERS) as executor:
+                pending = (schema for schema in schemas if tables_by_schema[schema['schema_name']])
+                futures = {
+                    schema['schema_name']: submit_catalog_fetches(executor, pool, schema)
+                    for schema in itertools.islice(pending, SCHEMA_WINDOW)
+                }
+                
+                # Create consolidated Excel file, appending each schema's rows
+                # as soon as its queries finish instead of combining them all
+                # in memory first. xlsxwriter in constant_memory mode flushes
+                # each row as it is written.
+                try:
+                    with xlsxwriter.Workbook(str(excel_path), {'constant_memory': True}) as workbook:
+                        worksheets = [workbook.add_worksheet(name) for name in SHEET_NAMES]
+                        next_rows = [0] * len(SHEET_NAMES)
+                        
+                        for schema in schemas:
+                            schema_name = schema['schema_name']
+                            logger.info(f"\nProcessing schema: {schema_name}")
+                            tables = tables_by_schema[schema_name]
+                            if not tables:
+                                logger.info(f"No tables found in schema: {schema_name}")
+                                continue
+                            
+                            logger.info(f"Found {len(tables)} tables in schema {schema_name}")
+                            schema_futures = futures.pop(schema_name)
+                            for next_schema in itertools.islice(pending, 1):
+                                futures[next_schema['schema_name']] = submit_catalog_fetches(executor, pool, next_schema)
+                            try:
+                                results = [future.result() for future in schema_futures]
+                            except Exception as e:
+                                logger.error(f"Error processing schema {schema_name}: {str(e)}")
+                                failed_schemas += 1
+                                continue
+                            
+                            for i, (headers, rows) in enumerate([(TABLE_HEADERS, tables)] + results):
+                                next_rows[i] = write_rows(worksheets[i], headers, rows, next_rows[i])
+                            written_schemas += 1
+                except Exception as e:
+                    logger.error(f"Error generating Excel file for database {db_config.name}: {str(e)}")
+                    return FAILED
+            
+            if not written_schemas:
+                excel_path.unlink()
+                return FAILED
+            # An incomplete workbook is kept for inspection but not reported
+            # as a success
+            if failed_schemas:
+                logger.error(f"Excel data dictionary for database {db_config.name} is missing {failed_schemas} schema(s)")
+                return FAILED
+            logger.info(f"Generated Excel data dictionary for database: {db_config.name}")
+        
+        finally:
+            pool.closeall()
+        
+        logger.info(f"Completed processing database: {db_config.name}")
+        return SUCCEEDED
+        
     except Exception as e:
-        return False, f"Unexpected error connecting to database {db_config['name']}: {str(e)}"
+        logger.error(f"Error processing database {db_config.name}: {str(e)}")
+        return FAILED
 
 def generate_data_dictionary(connection_file: str = 'config/connections.json', output_dir: str = 'output'):
     """Generate Excel-based data dictionary for configured databases."""
@@ -54,261 +421,42 @@ def generate_data_dictionary(connection_file: str = 'config/connections.json', o
     
     try:
         # Load database connections
-        with open(connection_file, 'r') as f:
-            connections = json.load(f)
+        connections = orjson.loads(Path(connection_file).read_bytes())
     except FileNotFoundError:
         logger.error(f"Connection file not found: {connection_file}")
         return
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         logger.error(f"Invalid JSON in connection file: {connection_file}")
         return
     
-    logger.info(f"Processing {len(connections['databases'])} databases...")
+    # Validate every entry once up front
+    try:
+        databases = [DBConfig.from_dict(config) for config in connections['databases']]
+    except KeyError as e:
+        logger.error(f"Missing setting {e} in connection file: {connection_file}")
+        return
     
-    for db_config in connections['databases']:
-        try:
-            logger.info(f"\nProcessing database: {db_config['name']}")
-            
-            # Test connection first
-            connection_success, error_message = test_connection(db_config)
-            if not connection_success:
-                logger.error(error_message)
-                failure_count += 1
-                continue
-            
-            # Create directory for this database
-            db_path = output_path / db_config['name']
-            db_path.mkdir(exist_ok=True)
-            
-            # Connect to database
-            conn = psycopg2.connect(
-                dbname=db_config['database'],
-                user=db_config['username'],
-                password=db_config['password'],
-                host=db_config['endpoint_rw'],
-                port=db_config['port']
-            )
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            # Lists to store information
-            all_tables_info = []
-            all_columns_info = []
-            all_constraints_info = []
-            all_indexes_info = []
-            
-            try:
-                # Get schemas
-                cursor.execute("""
-                    SELECT 
-                        nspname as schema_name,
-                        obj_description(oid, 'pg_namespace') as schema_description
-                    FROM pg_namespace 
-                    WHERE nspname NOT IN ('pg_catalog', 'information_schema', 'pg_toast')
-                    ORDER BY nspname;
-                """)
-                schemas = cursor.fetchall()
-                
-                if not schemas:
-                    logger.warning(f"No user schemas found in database {db_config['name']}")
-                    skipped_count += 1
-                    continue
-                
-                schema_success = False
-                # Process each schema
-                for schema in schemas:
-                    try:
-                        schema_name = schema['schema_name']
-                        logger.info(f"\nProcessing schema: {schema_name}")
-                        
-                        # Get tables in schema
-                        cursor.execute("""
-                            SELECT 
-                                schemaname,
-                                tablename,
-                                tableowner,
-                                obj_description(pgc.oid, 'pg_class') as table_description
-                            FROM pg_tables pt
-                            JOIN pg_class pgc ON pt.tablename = pgc.relname
-                            WHERE schemaname = %s
-                            ORDER BY tablename;
-                        """, (schema_name,))
-                        tables = cursor.fetchall()
-                        
-                        if not tables:
-                            logger.info(f"No tables found in schema: {schema_name}")
-                            continue
-                        
-                        logger.info(f"Found {len(tables)} tables in schema {schema_name}")
-                        
-                        # Process each table
-                        for table in tables:
-                            try:
-                                logger.info(f"Processing table: {table['tablename']}")
-                                table['schema_description'] = schema['schema_description']
-                                all_tables_info.append(table)
-                                
-                                # Get columns
-                                cursor.execute("""
-                                    WITH pk_info AS (
-                                        SELECT a.attname
-                                        FROM pg_index i
-                                        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
-                                        WHERE i.indrelid = %s::regclass
-                                        AND i.indisprimary
-                                    ),
-                                    fk_info AS (
-                                        SELECT
-                                            kcu.column_name,
-                                            ccu.table_schema AS foreign_schema,
-                                            ccu.table_name AS foreign_table,
-                                            ccu.column_name AS foreign_column
-                                        FROM information_schema.table_constraints tc
-                                        JOIN information_schema.key_column_usage kcu 
-                                            ON tc.constraint_name = kcu.constraint_name
-                                        JOIN information_schema.constraint_column_usage ccu
-                                            ON ccu.constraint_name = tc.constraint_name
-                                        WHERE tc.constraint_type = 'FOREIGN KEY'
-                                        AND tc.table_schema = %s
-                                        AND tc.table_name = %s
-                                    )
-                                    SELECT 
-                                        %s as schema_name,
-                                        %s as table_name,
-                                        a.attname as column_name,
-                                        pg_catalog.format_type(a.atttypid, a.atttypmod) as data_type,
-                                        col_description(a.attrelid, a.attnum) as column_description,
-                                        a.attnotnull as is_not_null,
-                                        (
-                                            SELECT pg_get_expr(adbin, adrelid)
-                                            FROM pg_attrdef
-                                            WHERE adrelid = a.attrelid
-                                            AND adnum = a.attnum
-                                            AND a.atthasdef
-                                        ) as default_value,
-                                        CASE WHEN pk.attname IS NOT NULL THEN true ELSE false END as is_primary_key,
-                                        fk.foreign_schema,
-                                        fk.foreign_table,
-                                        fk.foreign_column
-                                    FROM pg_catalog.pg_attribute a
-                                    JOIN pg_catalog.pg_class c ON a.attrelid = c.oid
-                                    JOIN pg_catalog.pg_namespace n ON c.relnamespace = n.oid
-                                    LEFT JOIN pk_info pk ON a.attname = pk.attname
-                                    LEFT JOIN fk_info fk ON a.attname = fk.column_name
-                                    WHERE c.relname = %s
-                                    AND n.nspname = %s
-                                    AND a.attnum > 0
-                                    AND NOT a.attisdropped
-                                    ORDER BY a.attnum;
-                                """, (f"{schema_name}.{table['tablename']}", schema_name, table['tablename'], 
-                                      schema_name, table['tablename'], table['tablename'], schema_name))
-                                columns = cursor.fetchall()
-                                all_columns_info.extend(columns)
-                                
-                                # Get constraints
-                                cursor.execute("""
-                                    SELECT
-                                        %s as schema_name,
-                                        %s as table_name,
-                                        con.conname as constraint_name,
-                                        CASE con.contype
-                                            WHEN 'p' THEN 'PRIMARY KEY'
-                                            WHEN 'f' THEN 'FOREIGN KEY'
-                                            WHEN 'u' THEN 'UNIQUE'
-                                            WHEN 'c' THEN 'CHECK'
-                                            ELSE con.contype::text
-                                        END as constraint_type,
-                                        pg_get_constraintdef(con.oid) as constraint_definition
-                                    FROM pg_catalog.pg_constraint con
-                                    JOIN pg_catalog.pg_class rel ON rel.oid = con.conrelid
-                                    JOIN pg_catalog.pg_namespace nsp ON nsp.oid = rel.relnamespace
-                                    WHERE rel.relname = %s
-                                    AND nsp.nspname = %s;
-                                """, (schema_name, table['tablename'], table['tablename'], schema_name))
-                                constraints = cursor.fetchall()
-                                all_constraints_info.extend(constraints)
-                                
-                                # Get indexes
-                                cursor.execute("""
-                                    SELECT
-                                        %s as schema_name,
-                                        %s as table_name,
-                                        i.relname as index_name,
-                                        am.amname as index_type,
-                                        pg_get_indexdef(i.oid) as index_definition
-                                    FROM pg_index x
-                                    JOIN pg_class c ON c.oid = x.indrelid
-                                    JOIN pg_class i ON i.oid = x.indexrelid
-                                    JOIN pg_am am ON i.relam = am.oid
-                                    JOIN pg_namespace n ON n.oid = c.relnamespace
-                                    WHERE c.relname = %s
-                                    AND n.nspname = %s;
-                                """, (schema_name, table['tablename'], table['tablename'], schema_name))
-                                indexes = cursor.fetchall()
-                                all_indexes_info.extend(indexes)
-                                
-                                schema_success = True
-                                
-                            except Exception as e:
-                                logger.error(f"Error processing table {table['tablename']}: {str(e)}")
-                                continue
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing schema {schema_name}: {str(e)}")
-                        continue
-                
-                if schema_success:
-                    # Create consolidated Excel file
-                    try:
-                        excel_path = db_path / f"{db_config['name']}_data_dictionary.xlsx"
-                        with pd.ExcelWriter(excel_path) as writer:
-                            # Write tables information
-                            pd.DataFrame(all_tables_info).to_excel(
-                                writer, sheet_name='Tables', index=False
-                            )
-                            
-                            # Write columns information
-                            pd.DataFrame(all_columns_info).to_excel(
-                                writer, sheet_name='Columns', index=False
-                            )
-                            
-                            # Write constraints information
-                            pd.DataFrame(all_constraints_info).to_excel(
-                                writer, sheet_name='Constraints', index=False
-                            )
-                            
-                            # Write indexes information
-                            pd.DataFrame(all_indexes_info).to_excel(
-                                writer, sheet_name='Indexes', index=False
-                            )
-                        logger.info(f"Generated Excel data dictionary for database: {db_config['name']}")
-                        success_count += 1
-                    except Exception as e:
-                        logger.error(f"Error generating Excel file for database {db_config['name']}: {str(e)}")
-                        failure_count += 1
-                else:
-                    failure_count += 1
-                
-            except Exception as e:
-                logger.error(f"Error processing database {db_config['name']}: {str(e)}")
+    logger.info(f"Processing {len(databases)} databases...")
+    
+    # Databases are independent and mostly wait on network I/O, so process
+    # them concurrently; each worker opens its own connections
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_DATABASE_WORKERS, len(databases)))) as executor:
+        futures = [executor.submit(_process_db, db_config, output_path) for db_config in databases]
+        for future in as_completed(futures):
+            status = future.result()
+            if status == SUCCEEDED:
+                success_count += 1
+            elif status == SKIPPED:
+                skipped_count += 1
+            else:
                 failure_count += 1
-            
-            finally:
-                cursor.close()
-                conn.close()
-            
-            logger.info(f"Completed processing database: {db_config['name']}")
-            
-        except Exception as e:
-            logger.error(f"Error processing database {db_config['name']}: {str(e)}")
-            failure_count += 1
-            continue
     
     # Print summary
     logger.info("\nData Dictionary Generation Summary:")
     logger.info(f"Successful: {success_count}")
     logger.info(f"Failed: {failure_count}")
     logger.info(f"Skipped: {skipped_count}")
-    logger.info(f"Total: {len(connections['databases'])}")
+    logger.info(f"Total: {len(databases)}")
 
 def main():
     """Main function to run the data dictionary generation."""
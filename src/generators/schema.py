@@ -1,9 +1,16 @@
-import json
+import orjson
+import os
+import multiprocessing
 from pathlib import Path
-from eralchemy import render_er
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from eralchemy.main import all_to_intermediary, filter_resources, intermediary_to_dot
 from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+import subprocess
+import tempfile
 import sys
 import logging
+from dataclasses import dataclass, fields
 
 # Configure logging
 logging.basicConfig(
@@ -16,44 +23,206 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# SQLAlchemy engines keyed by database URL, reused across calls
+_engines = {}
+
+# Maximum number of databases processed concurrently
+MAX_DATABASE_WORKERS = 16
+
+# Per-database outcomes reported in the run summary
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+# Graphviz output formats rendered for every schema
+DIAGRAM_FORMATS = ('png', 'pdf')
+
+# Every user schema with its physical tables, one row per table
+CATALOG_SNAPSHOT_SQL = text("""
+    SELECT 
+        n.nspname as schema_name,
+        c.relname as table_name
+    FROM pg_namespace n
+    LEFT JOIN pg_class c ON c.relnamespace = n.oid AND c.relkind IN ('r', 'p')
+    WHERE n.nspname NOT IN ('pg_catalog', 'information_schema', 'pg_toast')
+    ORDER BY n.nspname, c.relname
+""")
+
 def ensure_directory(path: Path):
     """Ensure directory and all its parents exist."""
     path.mkdir(parents=True, exist_ok=True)
 
-def has_physical_tables(engine, schema_name):
-    """Check if the schema has at least one physical table."""
-    try:
-        with engine.connect() as connection:
-            result = connection.execute(text("""
-                SELECT COUNT(*) 
-                FROM information_schema.tables 
-                WHERE table_schema = :schema 
-                AND table_type = 'BASE TABLE'
-            """), {'schema': schema_name})
-            count = result.scalar()
-            return count > 0
-    except Exception as e:
-        logger.error(f"Error checking for physical tables in schema {schema_name}: {str(e)}")
-        return False
+def get_engine(db_url):
+    """Return the pooled engine for a database URL, creating it on first use."""
+    engine = _engines.get(db_url)
+    if engine is None:
+        engine = create_engine(db_url, pool_size=5, max_overflow=5, pool_pre_ping=True)
+        _engines[db_url] = engine
+    return engine
+
+def fetch_catalog_snapshot(engine):
+    """Return {schema_name: [table_name, ...]} of physical tables for every user schema.
+    
+    Uses a single catalog query; schemas without tables map to an empty list.
+    """
+    with engine.connect() as connection:
+        result = connection.execute(CATALOG_SNAPSHOT_SQL)
+        snapshot = {}
+        for schema_name, table_name in result:
+            tables = snapshot.setdefault(schema_name, [])
+            if table_name is not None:
+                tables.append(table_name)
+    return snapshot
+
+@dataclass(frozen=True)
+class DBConfig:
+    """Connection settings of one database from the connection file."""
+    name: str
+    database: str
+    username: str
+    password: str
+    endpoint_rw: str
+    port: int
+    
+    @classmethod
+    def from_dict(cls, config):
+        """Build a DBConfig from a connection file entry, ignoring unknown keys."""
+        return cls(**{field.name: config[field.name] for field in fields(cls)})
+
+    def to_url(self):
+        """Return the SQLAlchemy URL of the database."""
+        return f"postgresql://{self.username}:{self.password}@{self.endpoint_rw}:{self.port}/{self.database}"
+
+def classify_connection_error(error, db_config):
+    """Return a readable message for a failure to connect to a database."""
+    error_msg = str(error)
+    if "password authentication failed" in error_msg.lower():
+        return f"Authentication failed for database {db_config.name}. Please check username and password."
+    elif "could not connect to server" in error_msg.lower():
+        return f"Could not connect to database {db_config.name} at {db_config.endpoint_rw}:{db_config.port}. Please check host and port."
+    elif "database" in error_msg.lower() and "does not exist" in error_msg.lower():
+        return f"Database {db_config.database} does not exist at {db_config.endpoint_rw}."
+    else:
+        return f"Error connecting to database {db_config.name}: {error_msg}"
+
+def _run_dot(dot_file, output_file, fmt):
+    """Render a Graphviz .dot file into the given output file and format."""
+    subprocess.run(['dot', f"-T{fmt}", str(dot_file), '-o', str(output_file)], check=True)
+    return output_file
 
-def test_connection(db_config):
-    """Test database connection and return (success, error_message)."""
+def _reflect_schema(job):
+    """Reflect one schema into a Graphviz .dot file; runs in a worker process.
+    
+    The schema is reflected once into eralchemy's intermediary model, from
+    which every diagram format is rendered. Unlike render_er, reflection
+    errors propagate to the caller.
+    """
+    schema_url, dot_file = job
+    tables, relationships = all_to_intermediary(schema_url)
+    # Sorts each table's columns as render_er does, keys first; reflection
+    # alone leaves them in arbitrary order
+    tables, relationships = filter_resources(tables, relationships)
+    intermediary_to_dot(tables, relationships, str(dot_file))
+    return dot_file
+
+def _process_db(db_config, output_path, executor, dot_executor):
+    """Generate the schema diagrams for one database.
+    
+    Reflection is submitted to the shared process pool and Graphviz runs to
+    the shared dot pool. Returns SUCCEEDED, FAILED or SKIPPED for the run
+    summary.
+    """
     try:
-        db_url = f"postgresql://{db_config['username']}:{db_config['password']}@{db_config['endpoint_rw']}:{db_config['port']}/{db_config['database']}"
-        engine = create_engine(db_url)
-        with engine.connect() as connection:
-            connection.execute(text("SELECT 1"))
-        return True, None
+        logger.info(f"\nProcessing database: {db_config.name}")
+        
+        # Get database URL
+        db_url = db_config.to_url()
+        
+        # One pooled engine per database, reused for every query against it
+        engine = get_engine(db_url)
+        
+        # Get schemas and their physical tables in one catalog query. It is
+        # the first query on the engine, so connection problems surface here
+        # without a separate test.
+        try:
+            snapshot = fetch_catalog_snapshot(engine)
+        except OperationalError as e:
+            logger.error(classify_connection_error(e, db_config))
+            return FAILED
+        
+        # Create directory for this database
+        db_path = output_path / db_config.name
+        ensure_directory(db_path)
+        
+        # Generate ERD for each schema
+        try:
+            if not snapshot:
+                logger.warning(f"No user schemas found in database {db_config.name}")
+                return SKIPPED
+            
+            # The intermediate .dot files are only needed until Graphviz has
+            # rendered them, so they live in a temporary directory rather
+            # than next to the diagrams
+            with tempfile.TemporaryDirectory() as dot_dir:
+                # Collect the reflection jobs for every schema with tables
+                futures = {}
+                for schema_name, tables in snapshot.items():
+                    logger.info(f"\nChecking schema: {schema_name}")
+                    
+                    # Skip schemas with no physical tables
+                    if not tables:
+                        logger.info(f"Skipping schema {schema_name} - no physical tables found")
+                        continue
+                    
+                    logger.info(f"Processing schema: {schema_name}")
+                    
+                    # Add schema filter to URL
+                    schema_url = f"{db_url}?options=-c%20search_path={schema_name}"
+                    
+                    # Generate PNG and PDF formats from one intermediate .dot file
+                    dot_file = Path(dot_dir) / f"{schema_name}_schema.dot"
+                    future = executor.submit(_reflect_schema, (schema_url, dot_file))
+                    futures[future] = schema_name
+                
+                # Hand each .dot file to Graphviz as soon as its schema has been
+                # reflected, so rendering overlaps with reflecting the rest
+                failed_schemas = set()
+                dot_futures = {}
+                for future in as_completed(futures):
+                    schema_name = futures[future]
+                    try:
+                        dot_file = future.result()
+                    except Exception as e:
+                        logger.error(f"Error processing schema {schema_name}: {str(e)}")
+                        failed_schemas.add(schema_name)
+                        continue
+                    for fmt in DIAGRAM_FORMATS:
+                        output_file = db_path / f"{schema_name}_schema.{fmt}"
+                        future = dot_executor.submit(_run_dot, dot_file, output_file, fmt)
+                        dot_futures[future] = (schema_name, fmt)
+                
+                for future in as_completed(dot_futures):
+                    schema_name, fmt = dot_futures[future]
+                    try:
+                        future.result()
+                        logger.info(f"Generated {fmt.upper()} for schema: {schema_name}")
+                    except Exception as e:
+                        logger.error(f"Error rendering {fmt.upper()} for schema {schema_name}: {str(e)}")
+                        failed_schemas.add(schema_name)
+            
+            if not set(futures.values()) - failed_schemas:
+                return FAILED
+            
+        except Exception as e:
+            logger.error(f"Error getting schemas for database {db_config.name}: {str(e)}")
+            return FAILED
+        
+        logger.info(f"Completed processing database: {db_config.name}")
+        return SUCCEEDED
+        
     except Exception as e:
-        error_msg = str(e)
-        if "password authentication failed" in error_msg.lower():
-            return False, f"Authentication failed for database {db_config['name']}. Please check username and password."
-        elif "could not connect to server" in error_msg.lower():
-            return False, f"Could not connect to database {db_config['name']} at {db_config['endpoint_rw']}:{db_config['port']}. Please check host and port."
-        elif "database" in error_msg.lower() and "does not exist" in error_msg.lower():
-            return False, f"Database {db_config['database']} does not exist at {db_config['endpoint_rw']}."
-        else:
-            return False, f"Error connecting to database {db_config['name']}: {error_msg}"
+        logger.error(f"Error processing database {db_config.name}: {str(e)}")
+        return FAILED
 
 def generate_schema_diagrams(connection_file: str = 'config/connections.json', output_dir: str = 'output'):
     """Generate ERD diagrams for all configured databases."""
@@ -67,111 +236,52 @@ def generate_schema_diagrams(connection_file: str = 'config/connections.json', o
     
     try:
         # Load database connections
-        with open(connection_file, 'r') as f:
-            connections = json.load(f)
+        connections = orjson.loads(Path(connection_file).read_bytes())
     except FileNotFoundError:
         logger.error(f"Connection file not found: {connection_file}")
         return
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         logger.error(f"Invalid JSON in connection file: {connection_file}")
         return
     
-    logger.info(f"Processing {len(connections['databases'])} databases...")
+    # Validate every entry once up front
+    try:
+        databases = [DBConfig.from_dict(config) for config in connections['databases']]
+    except KeyError as e:
+        logger.error(f"Missing setting {e} in connection file: {connection_file}")
+        return
     
-    for db_config in connections['databases']:
-        try:
-            logger.info(f"\nProcessing database: {db_config['name']}")
-            
-            # Test connection first
-            connection_success, error_message = test_connection(db_config)
-            if not connection_success:
-                logger.error(error_message)
-                failure_count += 1
-                continue
-            
-            # Create directory for this database
-            db_path = output_path / db_config['name']
-            ensure_directory(db_path)
-            
-            # Get database URL
-            db_url = f"postgresql://{db_config['username']}:{db_config['password']}@{db_config['endpoint_rw']}:{db_config['port']}/{db_config['database']}"
-            
-            # Generate ERD for each schema
-            try:
-                # Create engine for database connection
-                engine = create_engine(db_url)
-                
-                # Get list of schemas
-                with engine.connect() as connection:
-                    result = connection.execute(text("""
-                        SELECT 
-                            nspname as schema_name
-                        FROM pg_namespace 
-                        WHERE nspname NOT IN ('pg_catalog', 'information_schema', 'pg_toast')
-                        ORDER BY nspname;
-                    """))
-                    schemas = result.fetchall()
-                
-                if not schemas:
-                    logger.warning(f"No user schemas found in database {db_config['name']}")
-                    skipped_count += 1
-                    continue
-                
-                schema_success = False
-                for schema in schemas:
-                    try:
-                        schema_name = schema[0]
-                        logger.info(f"\nChecking schema: {schema_name}")
-                        
-                        # Skip schemas with no physical tables
-                        if not has_physical_tables(engine, schema_name):
-                            logger.info(f"Skipping schema {schema_name} - no physical tables found")
-                            continue
-                        
-                        logger.info(f"Processing schema: {schema_name}")
-                        
-                        # Add schema filter to URL
-                        schema_url = f"{db_url}?options=-c%20search_path={schema_name}"
-                        
-                        # Generate PNG format
-                        png_path = db_path / f"{schema_name}_schema.png"
-                        render_er(schema_url, str(png_path))
-                        logger.info(f"Generated PNG for schema: {schema_name}")
-                        
-                        # Generate PDF format
-                        pdf_path = db_path / f"{schema_name}_schema.pdf"
-                        render_er(schema_url, str(pdf_path))
-                        logger.info(f"Generated PDF for schema: {schema_name}")
-                        
-                        schema_success = True
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing schema {schema_name}: {str(e)}")
-                        continue
-                
-                if schema_success:
-                    success_count += 1
-                else:
-                    failure_count += 1
-                
-            except Exception as e:
-                logger.error(f"Error getting schemas for database {db_config['name']}: {str(e)}")
+    logger.info(f"Processing {len(databases)} databases...")
+    
+    # Schema reflection is CPU-heavy and independent per schema, so it runs
+    # in a shared pool of worker processes. Graphviz runs as its own process,
+    # so a thread per concurrent dot run is enough and leaves the workers free
+    # to reflect the next schema. Databases are handled concurrently by
+    # threads, which spend their time waiting on I/O. The process pool starts
+    # its workers lazily from those threads, so it uses spawn rather than
+    # forking a multithreaded process.
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context('spawn')) as executor, \
+            ThreadPoolExecutor(max_workers=os.cpu_count()) as dot_executor, \
+            ThreadPoolExecutor(max_workers=max(1, min(MAX_DATABASE_WORKERS, len(databases)))) as db_executor:
+        futures = [
+            db_executor.submit(_process_db, db_config, output_path, executor, dot_executor)
+            for db_config in databases
+        ]
+        for future in as_completed(futures):
+            status = future.result()
+            if status == SUCCEEDED:
+                success_count += 1
+            elif status == SKIPPED:
+                skipped_count += 1
+            else:
                 failure_count += 1
-                continue
-            
-            logger.info(f"Completed processing database: {db_config['name']}")
-            
-        except Exception as e:
-            logger.error(f"Error processing database {db_config['name']}: {str(e)}")
-            failure_count += 1
-            continue
     
     # Print summary
     logger.info("\nSchema Generation Summary:")
     logger.info(f"Successful: {success_count}")
     logger.info(f"Failed: {failure_count}")
     logger.info(f"Skipped: {skipped_count}")
-    logger.info(f"Total: {len(connections['databases'])}")
+    logger.info(f"Total: {len(databases)}")
 
 def main():
     """Main function to run the schema diagram generation."""
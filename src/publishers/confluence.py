@@ -1,37 +1,284 @@
-import json
+import orjson
 import base64
+import gzip
+import hashlib
+import html
+import mmap
+import os
+import shutil
+import string
+import tempfile
+import threading
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.filepost import choose_boundary
+from urllib3.util.retry import Retry
 from atlassian import Confluence
+from atlassian.errors import ApiError
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
-# Configure logging to output to both file and console
+# Verbose output, including every HTTP request, only when asked for with
+# CONFLUENCE_PUBLISHER_DEBUG=1
+DEBUG = os.environ.get('CONFLUENCE_PUBLISHER_DEBUG') == '1'
+
+# Configure logging to output to both file and console. Records are queued
+# and written by a background listener thread, so upload threads never block
+# on console or file I/O; the log file is only opened once something is
+# written to it.
+_log_queue = queue.Queue(-1)
+_log_listener = QueueListener(
+    _log_queue,
+    logging.StreamHandler(sys.stdout),
+    logging.FileHandler('confluence_publisher.log', delay=True)
+)
 logging.basicConfig(
-    level=logging.DEBUG,  # Set to DEBUG for more verbose output
+    level=logging.DEBUG if DEBUG else logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('confluence_publisher.log')
-    ]
+    handlers=[QueueHandler(_log_queue)]
 )
+_log_listener.start()
+# Flush the queue on exit
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
-# Enable debug logging for requests
-logging.getLogger('urllib3').setLevel(logging.DEBUG)
-logging.getLogger('requests').setLevel(logging.DEBUG)
+# HTTP library logging formats every request; keep it to warnings by default
+logging.getLogger('urllib3').setLevel(logging.DEBUG if DEBUG else logging.WARNING)
+logging.getLogger('requests').setLevel(logging.DEBUG if DEBUG else logging.WARNING)
+
+# Concurrent uploads share the session's connection pool, so the pool must be
+# at least as large as the number of upload workers
+UPLOAD_WORKERS = 8
+HTTP_POOL_MAXSIZE = 20
+
+# Upload requests per second allowed on average, with bursts up to the same
+# number; stays under Confluence Cloud's per-site rate limit so uploads are
+# not slowed down by 429 responses and Retry-After back-off
+UPLOAD_RATE_LIMIT = 40
+
+# Attachments hashed concurrently while the page is built
+HASH_WORKERS = 4
+
+# Identifies the publisher in Confluence's access logs
+USER_AGENT = 'database-artifacts-publisher'
+
+# Page property holding the hash of the last published documentation
+DOC_HASH_PROPERTY = 'doc_hash'
+
+# Static parts of the documentation page, filled in on each publish
+PAGE_HEADER_TEMPLATE = string.Template("""
+            <h1>Database Documentation</h1>
+            <p>Last Updated: $updated</p>
+            
+            <ac:structured-macro ac:name="info" ac:schema-version="1">
+                <ac:rich-text-body>
+                    <p>This page contains documentation for all databases including schema diagrams and data dictionaries.</p>
+                    <p>Documentation is automatically generated and updated regularly.</p>
+                </ac:rich-text-body>
+            </ac:structured-macro>
+            
+            <table>
+                <tr>
+                    <th>Database</th>
+                    <th>Schema</th>
+                    <th>Schema Diagram</th>
+                    <th>Schema Documentation</th>
+                    <th>Data Dictionary</th>
+                </tr>
+            """)
+
+# Cells of one table row; the database and data dictionary cells span all
+# of a database's schema rows and only appear in its first row
+DATABASE_CELL_TEMPLATE = string.Template("""
+                        <td rowspan="$num_schemas">$db_name</td>
+                        """)
+
+SCHEMA_CELLS_TEMPLATE = string.Template("""
+                        <td>$schema_name</td>
+                        <td>
+                            <ac:image ac:thumbnail="true" ac:width="200">
+                                <ri:attachment ri:filename="$png" />
+                            </ac:image>
+                        </td>
+                        <td>
+                            <ac:link>
+                                <ri:attachment ri:filename="$pdf" />
+                                <ac:plain-text-link-body>View Schema (PDF)</ac:plain-text-link-body>
+                            </ac:link>
+                        </td>
+                    """)
+
+DATA_DICTIONARY_CELL_TEMPLATE = string.Template("""
+                        <td rowspan="$num_schemas">
+                            <ac:link>
+                                <ri:attachment ri:filename="${db_name}_data_dictionary.xlsx" />
+                                <ac:plain-text-link-body>View Data Dictionary (Excel)</ac:plain-text-link-body>
+                            </ac:link>
+                        </td>
+                        """)
+
+VERSION_FOOTER_TEMPLATE = string.Template("""
+            <h2>Version Information</h2>
+            <ul>
+                <li>Last Updated: $updated</li>
+                <li>Update ID: $update_id</li>
+            </ul>
+            """)
+
+# Attachments worth compressing when compress_uploads is enabled; PNG and PDF
+# are already compressed internally
+COMPRESSIBLE_SUFFIXES = {'.xlsx'}
+
+# Attachment content types by file extension
+CONTENT_TYPES = {
+    '.png': 'image/png',
+    '.pdf': 'application/pdf',
+    '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+@lru_cache(maxsize=1024)
+def _escape(value):
+    """Escape a name for the page's XHTML; the same names recur on every publish."""
+    return html.escape(str(value), quote=True)
+
+@contextmanager
+def _map_file(file):
+    """Memory-map an open file read-only; empty files cannot be mapped and yield b''."""
+    if os.fstat(file.fileno()).st_size == 0:
+        yield b''
+        return
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield mapped
+
+@contextmanager
+def _gzip_to_tempfile(body):
+    """Gzip a request body into a temporary file and yield it rewound."""
+    with tempfile.TemporaryFile() as compressed:
+        with gzip.GzipFile(fileobj=compressed, mode='wb') as gz:
+            shutil.copyfileobj(body, gz)
+        compressed.seek(0)
+        yield compressed
+
+class _TokenBucket:
+    """Thread-safe token bucket allowing `rate` acquisitions per second on average."""
+    
+    def __init__(self, rate, capacity):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Take one token, sleeping until one is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self._rate
+            time.sleep(wait)
+
+class _MultipartBody:
+    """multipart/form-data request body that streams one file from disk.
+    
+    requests assembles files= uploads into a single bytes object, so every
+    attachment would be held in memory whole. This reads the form fields and
+    the file part on demand instead, and supports tell/seek so urllib3 can
+    rewind the body when it retries a request.
+    """
+    
+    def __init__(self, file, filename, content_type, fields):
+        boundary = choose_boundary()
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        head = [
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+            for name, value in fields.items()
+        ]
+        quoted_filename = filename.replace('"', '%22')
+        head.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; '
+            f'filename="{quoted_filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        )
+        self._head = ''.join(head).encode('utf-8')
+        self._tail = f'\r\n--{boundary}--\r\n'.encode('utf-8')
+        self._file = file
+        self._file_size = os.fstat(file.fileno()).st_size
+        self._length = len(self._head) + self._file_size + len(self._tail)
+        self._pos = 0
+    
+    def __len__(self):
+        return self._length
+    
+    def tell(self):
+        return self._pos
+    
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += self._length
+        self._pos = offset
+        return self._pos
+    
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self._length - self._pos
+        chunks = []
+        head_end = len(self._head)
+        file_end = head_end + self._file_size
+        while size > 0 and self._pos < self._length:
+            if self._pos < head_end:
+                chunk = self._head[self._pos:self._pos + size]
+            elif self._pos < file_end:
+                self._file.seek(self._pos - head_end)
+                chunk = self._file.read(min(size, file_end - self._pos))
+            else:
+                start = self._pos - file_end
+                chunk = self._tail[start:start + size]
+            if not chunk:
+                break
+            chunks.append(chunk)
+            self._pos += len(chunk)
+            size -= len(chunk)
+        return b''.join(chunks)
+
+class PartialPublishError(Exception):
+    """Raised when the page was updated but some attachments failed to upload."""
+    
+    def __init__(self, page_id, failed_uploads):
+        names = ', '.join(str(file_path) for file_path in failed_uploads)
+        super().__init__(f"{len(failed_uploads)} attachments failed to upload to page {page_id}: {names}")
+        self.page_id = page_id
+        self.failed_uploads = failed_uploads
 
 class ConfluencePublisher:
-    def __init__(self, config_file='config/confluence_config.json'):
+    def __init__(
+        self,
+        config_file='config/confluence_config.json',
+        state_file='config/confluence_state.json',
+        manifest_file='config/confluence_manifest.json'
+    ):
         """Initialize Confluence publisher with configuration."""
         try:
             logger.debug("Starting Confluence publisher initialization")
             
-            with open(config_file) as f:
-                self.config = json.load(f)
-                logger.debug(f"Loaded configuration from {config_file}")
+            self.config = orjson.loads(Path(config_file).read_bytes())
+            logger.debug(f"Loaded configuration from {config_file}")
             
             # Format URL for Confluence Cloud
             base_url = self.config['url'].rstrip('/')
@@ -41,17 +288,58 @@ class ConfluencePublisher:
             logger.info(f"Connecting to Confluence at {base_url}")
             logger.info(f"Using username: {self.config['username']}")
             
+            # Share one pooled session across all API calls so TCP/TLS
+            # connections are reused instead of re-established per request
+            self._session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=10,
+                pool_maxsize=HTTP_POOL_MAXSIZE,
+                # Retry rate-limited and transient failures transparently,
+                # honouring the Retry-After header Confluence sends with 429s
+                max_retries=Retry(
+                    total=5,
+                    backoff_factor=1.0,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                    allowed_methods=frozenset(['GET', 'POST', 'PUT', 'DELETE']),
+                    respect_retry_after_header=True
+                )
+            )
+            self._session.mount('https://', adapter)
+            # Authenticate at the session level so every request, including
+            # the direct attachment uploads, carries the same credentials
+            self._session.auth = (self.config['username'], self.config['api_token'])
+            self._session.headers['User-Agent'] = USER_AGENT
+            self._session.hooks['response'].append(self._log_rate_limit)
+            
+            # Paces attachment uploads across the upload workers
+            self._upload_bucket = _TokenBucket(UPLOAD_RATE_LIMIT, UPLOAD_RATE_LIMIT)
+            
+            # Page ids resolved in this process, keyed by (space_key, title)
+            self._page_ids = {}
+            
+            # Page id of the documentation page persisted between runs
+            self._state_file = Path(state_file)
+            
+            # Hash of every attachment last uploaded, so unchanged files are
+            # not uploaded again. Kept outside the output directory, which is
+            # recreated on every run.
+            self._manifest_file = Path(manifest_file)
+            
             # Initialize Confluence client with basic auth using API token
             logger.debug("Initializing Confluence client")
             self.confluence = Confluence(
                 url=base_url,
                 username=self.config['username'],
-                password=self.config['api_token']  # Use API token as password
+                password=self.config['api_token'],  # Use API token as password
+                cloud=True,
+                session=self._session
             )
             
-            # Test connection by getting space info
+            # Test connection by getting space info; get_space expands the
+            # description and homepage by default, which a credentials check
+            # does not need
             try:
-                space = self.confluence.get_space(self.config['space_key'])
+                space = self.confluence.get_space(self.config['space_key'], expand='')
                 logger.info(f"Successfully connected to space: {space['name']} ({space['key']})")
             except Exception as e:
                 logger.error(f"Failed to get space info: {str(e)}")
@@ -61,7 +349,7 @@ class ConfluencePublisher:
             logger.error(f"Configuration file not found: {config_file}")
             logger.info(f"Please copy {config_file}.template to {config_file} and update with your credentials")
             raise
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Invalid JSON in configuration file: {config_file}")
             logger.error(f"JSON Error: {str(e)}")
             raise
@@ -70,119 +358,265 @@ class ConfluencePublisher:
             logger.exception("Full exception details:")
             raise
     
+    @staticmethod
+    def _log_rate_limit(response, *args, **kwargs):
+        """Log the remaining Confluence rate-limit budget reported by a response."""
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        if remaining is not None:
+            logger.debug(f"Confluence rate limit remaining: {remaining}")
+    
+    def close(self):
+        """Close the underlying HTTP session and release pooled connections."""
+        self._session.close()
+    
     def _get_timestamp(self):
         """Get current timestamp in a readable format."""
         return datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
     
-    def _get_content_type(self, file_path):
+    @staticmethod
+    def _get_content_type(file_path):
         """Get content type based on file extension."""
-        extension = file_path.suffix.lower()
-        if extension == '.png':
-            return 'image/png'
-        elif extension == '.pdf':
-            return 'application/pdf'
-        elif extension == '.xlsx':
-            return 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        return 'application/octet-stream'
+        return CONTENT_TYPES.get(file_path.suffix.lower(), 'application/octet-stream')
     
     def _attach_file(self, page_id, file_path):
         """Attach a file to a Confluence page."""
         try:
-            with open(file_path, 'rb') as file:
-                logger.info(f"Attaching file: {file_path.name}")
-                content_type = self._get_content_type(file_path)
-                self.confluence.attach_content(
-                    content=file.read(),
-                    name=file_path.name,
-                    content_type=content_type,
-                    page_id=page_id,
-                    title=file_path.name,
-                    space=self.config['space_key'],
-                    comment='Automatically attached by documentation generator'
+            logger.info(f"Attaching file: {file_path.name}")
+            content_type = self._get_content_type(file_path)
+            # Stream the file from disk in blocks rather than building the
+            # whole multipart body in memory; PUT creates or updates the
+            # attachment
+            with open(file_path, 'rb') as file, ExitStack() as stack:
+                body = _MultipartBody(
+                    file,
+                    file_path.name,
+                    content_type,
+                    {
+                        'comment': 'Automatically attached by documentation generator',
+                        'minorEdit': 'true'
+                    }
+                )
+                data = body
+                headers = {
+                    'X-Atlassian-Token': 'no-check',
+                    'Content-Type': body.content_type
+                }
+                # Only for deployments behind a proxy that decodes compressed
+                # request bodies; Confluence itself does not
+                if self.config.get('compress_uploads') and file_path.suffix.lower() in COMPRESSIBLE_SUFFIXES:
+                    data = stack.enter_context(_gzip_to_tempfile(body))
+                    headers['Content-Encoding'] = 'gzip'
+                self._upload_bucket.acquire()
+                response = self._session.put(
+                    f"{self.confluence.url}/rest/api/content/{page_id}/child/attachment",
+                    data=data,
+                    headers=headers,
+                    timeout=self.confluence.timeout
                 )
-                logger.info(f"Successfully attached: {file_path.name}")
+                response.raise_for_status()
+            logger.info(f"Successfully attached: {file_path.name}")
         except Exception as e:
             logger.error(f"Error attaching file {file_path.name}: {str(e)}")
             raise
     
-    def _create_or_update_page(self, space_key, title, body):
-        """Create or update a Confluence page."""
+    def _attach_files(self, page_id, files):
+        """Attach files to a Confluence page concurrently.
+        
+        Per-file failures are logged without aborting the batch; returns the
+        list of files that could not be attached.
+        """
+        if not files:
+            return []
+        
+        def attach(file_path):
+            try:
+                self._attach_file(page_id, file_path)
+                return None
+            except Exception:
+                # Already logged by _attach_file; keep uploading the rest
+                return file_path
+        
+        with ThreadPoolExecutor(max_workers=min(UPLOAD_WORKERS, len(files))) as executor:
+            return [f for f in executor.map(attach, files) if f is not None]
+    
+    @staticmethod
+    def _hash_file(file_path):
+        """Return the SHA-256 hex digest of a file's contents.
+        
+        Uses hashlib.file_digest where available (Python 3.11+), otherwise
+        hashes a read-only memory map; neither reads the file into memory.
+        """
+        with open(file_path, 'rb') as f:
+            if hasattr(hashlib, 'file_digest'):
+                return hashlib.file_digest(f, 'sha256').hexdigest()
+            with _map_file(f) as content:
+                return hashlib.sha256(content).hexdigest()
+    
+    def _compute_digest(self, content, file_hashes):
+        """Hash the page content and attachment hashes to detect unchanged documentation."""
+        digest = hashlib.sha256(content.encode('utf-8'))
+        for name in sorted(file_hashes):
+            digest.update(name.encode('utf-8'))
+            digest.update(file_hashes[name].encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _load_manifest(self, page_id):
+        """Return the attachment hashes last uploaded to a page, keyed by relative path."""
+        try:
+            manifest = orjson.loads(self._manifest_file.read_bytes())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return {}
+        # Hashes recorded for another page say nothing about this one
+        if manifest.get('page_id') != page_id:
+            return {}
+        return manifest.get('files', {})
+    
+    def _save_manifest(self, page_id, file_hashes):
+        """Record the attachment hashes now uploaded to a page."""
+        manifest = {'page_id': page_id, 'files': file_hashes}
+        self._manifest_file.write_bytes(orjson.dumps(manifest))
+    
+    def _get_doc_hash(self, page_id):
+        """Return the stored documentation hash and its property version, if any."""
+        try:
+            prop = self.confluence.get_page_property(page_id, DOC_HASH_PROPERTY)
+        except ApiError:
+            return None, None
+        return prop['value'].get('sha256'), prop['version']['number']
+    
+    def _set_doc_hash(self, page_id, digest, version=None):
+        """Store the documentation hash as a page property."""
+        data = {'key': DOC_HASH_PROPERTY, 'value': {'sha256': digest}}
+        if version is None:
+            self.confluence.set_page_property(page_id, data)
+        else:
+            data['version'] = {'number': version + 1}
+            self.confluence.update_page_property(page_id, data)
+    
+    def _resolve_page_ids(self, space_key, titles):
+        """Look up ids of existing pages for the given titles.
+        
+        Several titles are batched into one CQL search. CQL reads the search
+        index, which can lag behind recently created pages, so any title it
+        does not find (and a single title) is looked up directly by title.
+        """
+        missing = [t for t in titles if (space_key, t) not in self._page_ids]
+        if not missing:
+            return
+        
+        if len(missing) > 1:
+            title_clauses = ' OR '.join(
+                'title = "{}"'.format(t.replace('"', '\\"')) for t in missing
+            )
+            response = self.confluence.cql(
+                f'space = "{space_key}" AND type = page AND ({title_clauses})',
+                limit=max(25, len(missing))
+            )
+            for result in response.get('results', []):
+                content = result.get('content', {})
+                if content.get('title') in missing:
+                    self._page_ids[(space_key, content['title'])] = content['id']
+        
+        for title in missing:
+            if (space_key, title) in self._page_ids:
+                continue
+            page = self.confluence.get_page_by_title(space=space_key, title=title)
+            if page:
+                self._page_ids[(space_key, title)] = page['id']
+    
+    def _load_page_id(self, space_key, title):
+        """Seed the page id cache from the state file if the page still exists.
+        
+        A direct lookup by id is much cheaper for Confluence than the CQL
+        title search; the search remains the fallback.
+        """
+        if (space_key, title) in self._page_ids:
+            return
+        try:
+            state = orjson.loads(self._state_file.read_bytes())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return
+        if state.get('space_key') != space_key or state.get('title') != title:
+            return
+        try:
+            page = self.confluence.get_page_by_id(state['page_id'], expand='version')
+        except ApiError:
+            logger.info(f"Cached page id {state['page_id']} no longer exists, searching by title")
+            return
+        if page.get('status') == 'current':
+            self._page_ids[(space_key, title)] = page['id']
+    
+    def _save_page_id(self, space_key, title, page_id):
+        """Persist the documentation page id for the next run."""
+        state = {'space_key': space_key, 'title': title, 'page_id': page_id}
+        self._state_file.write_bytes(orjson.dumps(state))
+    
+    def _create_page(self, space_key, title, body):
+        """Create a Confluence page at the root of the space and return its id."""
         try:
-            existing_page = self.confluence.get_page_by_title(
+            logger.info(f"Creating new page: {title}")
+            page = self.confluence.create_page(
                 space=space_key,
-                title=title
+                title=title,
+                body=body,
+                parent_id=None,  # Create at root level
+                type='page',
+                representation='storage'
+            )
+            self._page_ids[(space_key, title)] = page['id']
+            return page['id']
+        except Exception as e:
+            logger.error(f"Error creating page {title}: {str(e)}")
+            raise
+    
+    def _update_page(self, page_id, title, body):
+        """Replace the content of an existing Confluence page."""
+        try:
+            logger.info(f"Updating existing page: {title}")
+            self.confluence.update_page(
+                page_id=page_id,
+                title=title,
+                body=body,
+                type='page',
+                representation='storage'
             )
-            
-            if existing_page:
-                logger.info(f"Updating existing page: {title}")
-                self.confluence.update_page(
-                    page_id=existing_page['id'],
-                    title=title,
-                    body=body,
-                    type='page',
-                    representation='storage'
-                )
-                return existing_page['id']
-            else:
-                logger.info(f"Creating new page: {title}")
-                page = self.confluence.create_page(
-                    space=space_key,
-                    title=title,
-                    body=body,
-                    parent_id=None,  # Create at root level
-                    type='page',
-                    representation='storage'
-                )
-                return page['id']
         except Exception as e:
-            logger.error(f"Error creating/updating page {title}: {str(e)}")
+            logger.error(f"Error updating page {title}: {str(e)}")
             raise
     
     def _get_schema_info(self, doc_path):
         """Get schema information including files."""
-        schema_files = {}
-        for file_path in doc_path.glob('*_schema.*'):
-            schema_name = file_path.stem.replace('_schema', '')
-            ext = file_path.suffix.lower()
-            if schema_name not in schema_files:
-                schema_files[schema_name] = {'png': None, 'pdf': None}
-            schema_files[schema_name][ext[1:]] = file_path.name
-        return schema_files
+        schema_files = defaultdict(lambda: {'png': None, 'pdf': None})
+        # One directory read, parsing plain entry names instead of building
+        # and inspecting a Path per file
+        with os.scandir(doc_path) as entries:
+            for entry in entries:
+                stem, _, ext = entry.name.rpartition('.')
+                if not stem.endswith('_schema') or not entry.is_file():
+                    continue
+                schema_name = stem[:-len('_schema')]
+                # Interned so the key matches the 'png'/'pdf' literals by identity
+                schema_files[schema_name][sys.intern(ext.lower())] = entry.name
+        # Directory order follows file creation on some filesystems, which
+        # varies between runs; sort so the page rows and digest are stable
+        return dict(sorted(schema_files.items()))
     
     def publish_documentation(self, doc_dir: str = 'output', databases=None):
-        """Publish database documentation to Confluence."""
+        """Publish database documentation to Confluence.
+        
+        Raises PartialPublishError when the page was updated but some
+        attachments could not be uploaded.
+        """
         try:
             logger.info("Starting documentation publish")
             timestamp = self._get_timestamp()
             space_key = self.config['space_key']
             title = self.config['page_title']  # Use fixed title from config
             
-            # Start building the page content
-            body = f"""
-            <h1>Database Documentation</h1>
-            <p>Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-            
-            <ac:structured-macro ac:name="info" ac:schema-version="1">
-                <ac:rich-text-body>
-                    <p>This page contains documentation for all databases including schema diagrams and data dictionaries.</p>
-                    <p>Documentation is automatically generated and updated regularly.</p>
-                </ac:rich-text-body>
-            </ac:structured-macro>
-            
-            <table>
-                <tr>
-                    <th>Database</th>
-                    <th>Schema</th>
-                    <th>Schema Diagram</th>
-                    <th>Schema Documentation</th>
-                    <th>Data Dictionary</th>
-                </tr>
-            """
-            
-            # Create or update the page first to get the page ID
-            page_id = self._create_or_update_page(space_key, title, body + "</table>")
-            
-            # Process each database
+            # Collect documentation for every database first so that all
+            # attachments can be uploaded through one shared worker pool
+            documented = []
+            attachments = {}
             for db_config in databases:
                 db_name = db_config['name']
                 doc_path = Path(doc_dir) / db_name
@@ -192,83 +626,120 @@ class ConfluencePublisher:
                     continue
                 
                 # Get schema information
-                schema_files = self._get_schema_info(doc_path)
+                documented.append((db_name, self._get_schema_info(doc_path)))
+                with os.scandir(doc_path) as entries:
+                    # Keyed by path relative to doc_dir, as in the publish
+                    # manifest
+                    attachments.update(
+                        (f"{db_name}/{e.name}", Path(e.path)) for e in entries if e.is_file()
+                    )
+            
+            # Hash every attachment once; the hashes drive both the whole-page
+            # skip and the per-file upload skip. Hashing runs on worker
+            # threads (hashlib releases the GIL on large buffers) while the
+            # table rows are built and the page is looked up.
+            with ThreadPoolExecutor(max_workers=HASH_WORKERS) as hash_executor:
+                hash_futures = {
+                    key: hash_executor.submit(self._hash_file, file_path)
+                    for key, file_path in attachments.items()
+                }
                 
-                # Find data dictionary Excel file
-                data_dict_file = doc_path / f'{db_name}_data_dictionary.xlsx'
-                if data_dict_file.exists():
-                    self._attach_file(page_id, data_dict_file)
+                # Build the table rows for each database from a list of fragments
+                rows = []
+                for db_name, schema_files in documented:
+                    # Process each schema
+                    num_schemas = len(schema_files)
+                    for i, (schema_name, files) in enumerate(schema_files.items()):
+                        # Add row to table
+                        rows.append("<tr>")
+                        
+                        # Database column with rowspan for first schema only
+                        if i == 0:
+                            rows.append(DATABASE_CELL_TEMPLATE.substitute(
+                                num_schemas=num_schemas, db_name=_escape(db_name)
+                            ))
+                        
+                        # Schema info
+                        rows.append(SCHEMA_CELLS_TEMPLATE.substitute(
+                            schema_name=_escape(schema_name.upper()),
+                            png=_escape(files['png']),
+                            pdf=_escape(files['pdf'])
+                        ))
+                        
+                        # Data dictionary column with rowspan for first schema only
+                        if i == 0:
+                            rows.append(DATA_DICTIONARY_CELL_TEMPLATE.substitute(
+                                num_schemas=num_schemas, db_name=_escape(db_name)
+                            ))
+                        
+                        rows.append("</tr>")
+                rows = "".join(rows)
                 
-                # Process each schema
-                num_schemas = len(schema_files)
-                for i, (schema_name, files) in enumerate(schema_files.items()):
-                    # Attach files first
-                    if files['png']:
-                        png_path = doc_path / files['png']
-                        self._attach_file(page_id, png_path)
-                    
-                    if files['pdf']:
-                        pdf_path = doc_path / files['pdf']
-                        self._attach_file(page_id, pdf_path)
-                    
-                    # Add row to table
-                    body += "<tr>"
-                    
-                    # Database column with rowspan for first schema only
-                    if i == 0:
-                        body += f"""
-                        <td rowspan="{num_schemas}">{db_name}</td>
-                        """
-                    
-                    # Schema info
-                    body += f"""
-                        <td>{schema_name.upper()}</td>
-                        <td>
-                            <ac:image ac:thumbnail="true" ac:width="200">
-                                <ri:attachment ri:filename="{files['png']}" />
-                            </ac:image>
-                        </td>
-                        <td>
-                            <ac:link>
-                                <ri:attachment ri:filename="{files['pdf']}" />
-                                <ac:plain-text-link-body>View Schema (PDF)</ac:plain-text-link-body>
-                            </ac:link>
-                        </td>
-                    """
-                    
-                    # Data dictionary column with rowspan for first schema only
-                    if i == 0:
-                        body += f"""
-                        <td rowspan="{num_schemas}">
-                            <ac:link>
-                                <ri:attachment ri:filename="{db_name}_data_dictionary.xlsx" />
-                                <ac:plain-text-link-body>View Data Dictionary (Excel)</ac:plain-text-link-body>
-                            </ac:link>
-                        </td>
-                        """
-                    
-                    body += "</tr>"
+                # Look up the existing page while hashing finishes
+                self._load_page_id(space_key, title)
+                self._resolve_page_ids(space_key, [title])
+                
+                file_hashes = {key: future.result() for key, future in hash_futures.items()}
             
-            # Close the table
-            body += "</table>"
+            # Skip the publish when neither the documented content nor any
+            # attachment has changed since the last successful run
+            digest = self._compute_digest(rows, file_hashes)
+            existing_page_id = self._page_ids.get((space_key, title))
+            hash_version = None
+            if existing_page_id:
+                stored_digest, hash_version = self._get_doc_hash(existing_page_id)
+                if stored_digest == digest:
+                    logger.info("Documentation unchanged since last publish, skipping update")
+                    return existing_page_id
             
-            # Add version information
-            body += f"""
-            <h2>Version Information</h2>
-            <ul>
-                <li>Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</li>
-                <li>Update ID: {timestamp}</li>
-            </ul>
-            """
+            # Start building the page content
+            updated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            body = PAGE_HEADER_TEMPLATE.substitute(updated=updated)
+            
+            # Attachments need a page to hang off, so only a missing page is
+            # created up front, with an empty table; an existing page is
+            # updated once, below, with the complete content. The title was
+            # already looked up above, so the page is created directly
+            page_id = existing_page_id
+            if not page_id:
+                page_id = self._create_page(space_key, title, body + "</table>")
+            
+            # Upload the data dictionaries and schema diagrams that changed
+            # since they were last uploaded to this page, all concurrently
+            uploaded_hashes = self._load_manifest(page_id)
+            pending = {
+                key: file_path for key, file_path in attachments.items()
+                if uploaded_hashes.get(key) != file_hashes[key]
+            }
+            logger.info(f"Skipping {len(attachments) - len(pending)} unchanged attachments")
+            failed_uploads = self._attach_files(page_id, list(pending.values()))
+            
+            # Record what is now on the page; failed files are dropped so
+            # they are uploaded again on the next run
+            for key, file_path in pending.items():
+                if file_path in failed_uploads:
+                    uploaded_hashes.pop(key, None)
+                else:
+                    uploaded_hashes[key] = file_hashes[key]
+            self._save_manifest(page_id, uploaded_hashes)
+            
+            # Add the table rows, close the table and add version information
+            body = "".join([
+                body,
+                rows,
+                "</table>",
+                VERSION_FOOTER_TEMPLATE.substitute(updated=updated, update_id=timestamp)
+            ])
             
             # Update the page with the complete content
-            self.confluence.update_page(
-                page_id=page_id,
-                title=title,
-                body=body,
-                type='page',
-                representation='storage'
-            )
+            self._update_page(page_id, title, body)
+            self._save_page_id(space_key, title, page_id)
+            
+            # Only record the hash once everything was uploaded, so a partial
+            # publish is retried in full on the next run
+            if failed_uploads:
+                raise PartialPublishError(page_id, failed_uploads)
+            self._set_doc_hash(page_id, digest, hash_version)
             
             logger.info("Successfully published documentation")
             return page_id
@@ -283,15 +754,21 @@ def main():
         logger.info("Starting Confluence publisher")
         publisher = ConfluencePublisher()
         
-        # Get list of databases from connections file
-        with open('config/connections.json') as f:
-            connections = json.load(f)
-        
-        # Publish documentation for all databases
-        page_id = publisher.publish_documentation(
-            databases=connections['databases']
-        )
-        logger.info(f"Documentation published successfully. Page ID: {page_id}")
+        try:
+            # Get list of databases from connections file
+            connections = orjson.loads(Path('config/connections.json').read_bytes())
+            
+            # Publish documentation for all databases
+            page_id = publisher.publish_documentation(
+                databases=connections['databases']
+            )
+            logger.info(f"Documentation published successfully. Page ID: {page_id}")
+        except PartialPublishError as e:
+            # The rest of the batch was published; the missing attachments are
+            # uploaded again on the next run
+            logger.error(f"Documentation partially published. Page ID: {e.page_id}")
+        finally:
+            publisher.close()
                 
     except Exception as e:
         logger.error(f"Error initializing publisher: {str(e)}")